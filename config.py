@@ -7,6 +7,13 @@ class Config:
     FLASKY_MAIL_SUBJECT_PREFIX = '[PERC]'
     FLASKY_MAIL_SENDER = 'PERC Admin <flasky@example.com>'
     FLASKY_ADMIN = os.environ.get('PERC_ADMIN')
+    PERC_REPORT_DIR = os.environ.get('PERC_REPORT_DIR') or \
+        os.path.join(basedir, 'reports')
+    PERC_LOCATION_CACHE_SECONDS = int(os.environ.get('PERC_LOCATION_CACHE_SECONDS') or 300)
+    PERC_API_MAX_BATCH = int(os.environ.get('PERC_API_MAX_BATCH') or 10)
+    PERC_WARM_START = os.environ.get('PERC_WARM_START') == '1'
+    PERC_WARM_START_CONNECTIONS = int(os.environ.get('PERC_WARM_START_CONNECTIONS') or 2)
+    PERC_SCHEDULER_HOUR = int(os.environ.get('PERC_SCHEDULER_HOUR') or 2)
 
     @staticmethod
     def init_app(app):
@@ -32,10 +39,16 @@ class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'data.sqlite')
 
+class LoadTestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get('LOADTEST_DATABASE_URL') or \
+        'sqlite:///' + os.path.join(basedir, 'loadtest.sqlite')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
 config = {
     'development': DevelopmentConfig,
     'testing': TestingConfig,
     'production': ProductionConfig,
+    'loadtest': LoadTestConfig,
 
     'default': DevelopmentConfig
     }
@@ -0,0 +1,20 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+#
+# The app is created once in the master (PERC_WARM_START=1 preloads the report
+# engine and the location registry there) and each worker opens its own pooled
+# database connections after the fork.
+import os
+
+# Set before perc is imported, since config.py reads the environment at import.
+os.environ.setdefault('PERC_WARM_START', '1')
+
+from perc import warm_pool
+
+bind = os.environ.get('PERC_BIND') or '127.0.0.1:8000'
+workers = int(os.environ.get('PERC_WORKERS') or 4)
+timeout = 300
+preload_app = True
+
+
+def post_fork(server, worker):
+    warm_pool(worker.app.wsgi())
@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+"""Concurrent HTTP load test for the /report and /dashboard endpoints.
+
+For capacity planning, point it at a deployment configured like production:
+
+    python loadtest.py run --url http://perc:8000 --server-pid <master pid> --users 20
+
+--server-pid samples the RSS of that process and its workers (Linux /proc).
+
+Without --url, the app is built with create_app('loadtest'), which uses
+LOADTEST_DATABASE_URL or a local loadtest.sqlite, and served locally:
+
+    python loadtest.py seed --days 45 --locations 5 --users 20
+    python loadtest.py run --users 20 --duration 120 --workers 4
+
+The local server is gunicorn with --workers pre-forked workers, warm started
+(PERC_WARM_START) like a production deployment should be.  --server werkzeug
+runs a single threaded worker instead, for machines without gunicorn (it is in
+requirements.txt); its
+figures are for comparison only and do not describe a real deployment."""
+import argparse
+import datetime
+import http.cookiejar
+import importlib.util
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+CONFIG_NAME = 'loadtest'
+PASSWORD = 'LogWare'
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+RANGE_DAYS = (1, 7, 30)
+
+
+def guid():
+    return uuid.uuid4().hex
+
+
+def seed(days, locations, users, reset=False):
+    """Fill the load-test database with locations, users and readings."""
+    from sqlalchemy import CheckConstraint
+    from perc import create_app, db
+    from perc.models import Asset, Location, LogSession, Reading, User
+
+    app = create_app(CONFIG_NAME)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            # The LogWare schema uses PostgreSQL casts in its check constraints.
+            for table in db.metadata.tables.values():
+                for constraint in list(table.constraints):
+                    if isinstance(constraint, CheckConstraint):
+                        table.constraints.discard(constraint)
+        if reset:
+            db.drop_all()
+        db.create_all()
+        if Location.query.count():
+            print('Database already seeded, use --reset to reseed.')
+            return
+
+        logger = Asset(asset_guid=guid(), asset_type=0, model='LT', serial='logger',
+                       active=True, deleted=False)
+        sensor = Asset(asset_guid=guid(), asset_type=1, model='LT', serial='sensor',
+                       active=True, deleted=False)
+        owner = User(user_guid=guid(), login_name='loadtest0', active=True, deleted=False)
+        db.session.add_all([logger, sensor, owner])
+        db.session.add_all([User(user_guid=guid(), login_name='loadtest{}'.format(n),
+                                 active=True, deleted=False)
+                            for n in range(1, users + 1)])
+
+        end = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = end - datetime.timedelta(days=days + 1)
+        session = LogSession(log_session_guid=guid(), session_start=start, session_end=end,
+                             logging_interval=300, logger_guid=logger.asset_guid,
+                             user_guid=owner.user_guid, session_type=0, computer_name='loadtest')
+        db.session.add(session)
+        for n in range(locations):
+            db.session.add(Location(location_guid=guid(), location_name='LT-{}'.format(n),
+                                    active=True, deleted=False))
+        db.session.commit()
+
+        steps = int((end - start).total_seconds() // session.logging_interval)
+        for location in Location.query.all():
+            rows = []
+            for step in range(steps):
+                time_stamp = start + datetime.timedelta(seconds=step * session.logging_interval)
+                for reading_type, value in ((0, random.gauss(22.8, 2.0)),
+                                            (1, random.gauss(50.0, 12.0))):
+                    rows.append(dict(reading_guid=guid(), reading=value,
+                                     reading_type=reading_type, time_stamp=time_stamp,
+                                     log_session_guid=session.log_session_guid,
+                                     sensor_guid=sensor.asset_guid,
+                                     location_guid=location.location_guid,
+                                     channel=reading_type, max_alarm=False,
+                                     min_alarm=False, compromised=False))
+            db.engine.execute(Reading.__table__.insert(), rows)
+        print('Seeded {} locations, {} users, {} days of readings.'.format(
+            locations, users, days))
+
+
+def serve(port, workers, server='gunicorn'):
+    """Serve the warm-started load-test app with pre-forked gunicorn workers.
+
+    With ``server='werkzeug'`` a single threaded werkzeug worker is used."""
+    os.environ['PERC_WARM_START'] = '1'
+    from perc import create_app, warm_pool
+
+    app = create_app(CONFIG_NAME)
+    if server == 'werkzeug':
+        from werkzeug.serving import run_simple
+        warm_pool(app)
+        run_simple('127.0.0.1', port, app, threaded=True)
+        return
+
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', '127.0.0.1:{}'.format(port))
+            self.cfg.set('workers', workers)
+            self.cfg.set('timeout', 300)
+            self.cfg.set('post_fork', lambda arbiter, worker: warm_pool(app))
+
+        def load(self):
+            return app
+
+    Server().run()
+
+
+def rss_kb(pid):
+    """Return the resident set size of ``pid`` in kB, or None if it is gone."""
+    try:
+        with open('/proc/{}/status'.format(pid)) as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (IOError, OSError):
+        return None
+
+
+def process_tree(pid):
+    """Return ``pid`` and all of its descendants, read from /proc."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open('/proc/{}/stat'.format(entry)) as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (IOError, OSError, IndexError, ValueError):
+                continue
+            parents.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(parents.get(current, []))
+    return tree
+
+
+class Client:
+    """One logged-in user session."""
+
+    def __init__(self, base_url, login_name):
+        self.base_url = base_url
+        self.login_name = login_name
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.csrf_token = None
+
+    def get(self, path):
+        with self.opener.open(self.base_url + path, timeout=300) as response:
+            return response.geturl(), response.read().decode('utf-8')
+
+    def post(self, path, data):
+        data = dict(data, csrf_token=self.csrf_token)
+        body = urllib.parse.urlencode(data).encode('utf-8')
+        with self.opener.open(self.base_url + path, body, timeout=300) as response:
+            return response.geturl(), response.read().decode('utf-8')
+
+    def fetch_csrf_token(self, path):
+        _, html = self.get(path)
+        self.csrf_token = CSRF_RE.search(html).group(1)
+
+    def login(self):
+        self.fetch_csrf_token('/login')
+        url, _ = self.post('/login', dict(username=self.login_name, password=PASSWORD))
+        if '/dashboard' not in url:
+            raise RuntimeError('Login failed for {}'.format(self.login_name))
+        self.fetch_csrf_token('/report')
+
+
+class LoadTest:
+    def __init__(self, base_url, users, duration, days, locations, dashboard_ratio):
+        self.base_url = base_url
+        self.users = users
+        self.duration = duration
+        self.days = days
+        self.locations = locations
+        self.dashboard_ratio = dashboard_ratio
+        self.results = []
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def report_form(self):
+        """Return /report form data for a random location and date range."""
+        length = random.choice([n for n in RANGE_DAYS if n <= self.days] or [1])
+        today = datetime.date.today()
+        end = today - datetime.timedelta(days=random.randint(1, self.days - length + 1))
+        start = end - datetime.timedelta(days=length - 1)
+        return dict(location=random.randrange(self.locations),
+                    start_date=start.isoformat(), end_date=end.isoformat(),
+                    temperature='73.00', temp_tol='6.00',
+                    humidity='50.00', humid_tol='20.00')
+
+    def user(self, n):
+        client = Client(self.base_url, 'loadtest{}'.format(n))
+        try:
+            client.login()
+        except Exception as e:
+            self.record('login', 0.0, str(e))
+            return
+        while not self.stop.is_set():
+            if random.random() < self.dashboard_ratio:
+                endpoint, request = 'dashboard', lambda: client.get('/dashboard')
+                expected_path, expected_text = '/dashboard', 'PERC | Dashboard'
+            else:
+                data = self.report_form()
+                endpoint, request = 'report', lambda: client.post('/report', data)
+                expected_path, expected_text = '/report', 'Summary Report'
+            started = time.time()
+            try:
+                url, html = request()
+                error = None
+                if urllib.parse.urlparse(url).path != expected_path:
+                    error = 'Redirected to {}'.format(urllib.parse.urlparse(url).path)
+                elif expected_text not in html:
+                    error = 'Unexpected page from {}'.format(expected_path)
+            except urllib.error.HTTPError as e:
+                error = 'HTTP {}'.format(e.code)
+            except Exception as e:
+                error = str(e)
+            self.record(endpoint, time.time() - started, error)
+            if error is not None:
+                # An expired session or CSRF token; log in again for the next request.
+                try:
+                    client.login()
+                except Exception as e:
+                    self.record('login', 0.0, str(e))
+
+    def record(self, endpoint, latency, error):
+        with self.lock:
+            self.results.append((time.time(), endpoint, latency, error))
+
+    def run(self, server_pid=None, interval=1.0):
+        threads = [threading.Thread(target=self.user, args=(n,), daemon=True)
+                   for n in range(1, self.users + 1)]
+        started = time.time()
+        for thread in threads:
+            thread.start()
+        memory = []
+        while time.time() - started < self.duration:
+            if server_pid:
+                sample = {pid: rss_kb(pid) for pid in process_tree(server_pid)}
+                memory.append((time.time() - started, sample))
+            time.sleep(interval)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return self.summary(time.time() - started, memory)
+
+    def summary(self, elapsed, memory):
+        summary = dict(users=self.users, elapsed_s=elapsed, endpoints={}, memory_kb=memory)
+        for endpoint in sorted(set(r[1] for r in self.results)):
+            rows = [r for r in self.results if r[1] == endpoint]
+            latencies = sorted(r[2] for r in rows if r[3] is None)
+            errors = [r[3] for r in rows if r[3] is not None]
+            summary['endpoints'][endpoint] = dict(
+                requests=len(rows),
+                throughput_rps=len(latencies) / elapsed,
+                error_rate=len(errors) / len(rows),
+                errors=sorted(set(errors)),
+                latency_s={'p{}'.format(p): percentile(latencies, p)
+                           for p in (50, 90, 95, 99)})
+        return summary
+
+
+def percentile(values, p):
+    """Return the nearest-rank ``p`` percentile of sorted ``values``."""
+    if not values:
+        return None
+    index = max(0, int(round(p / 100.0 * len(values))) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def print_summary(summary):
+    print('{} users, {:.1f}s'.format(summary['users'], summary['elapsed_s']))
+    print('{:<10} {:>8} {:>8} {:>7} {:>8} {:>8} {:>8} {:>8}'.format(
+        'endpoint', 'requests', 'req/s', 'errors', 'p50', 'p90', 'p95', 'p99'))
+    for endpoint, stats in summary['endpoints'].items():
+        latency = ['{:.3f}'.format(v) if v is not None else '-'
+                   for v in stats['latency_s'].values()]
+        print('{:<10} {:>8} {:>8.2f} {:>6.1%} {:>8} {:>8} {:>8} {:>8}'.format(
+            endpoint, stats['requests'], stats['throughput_rps'],
+            stats['error_rate'], *latency))
+        for error in stats['errors']:
+            print('    {}'.format(error))
+    if summary['memory_kb']:
+        print('Per-worker RSS (kB): pid min max')
+        peaks = {}
+        for _, sample in summary['memory_kb']:
+            for pid, rss in sample.items():
+                if rss is not None:
+                    low, high = peaks.get(pid, (rss, rss))
+                    peaks[pid] = (min(low, rss), max(high, rss))
+        for pid, (low, high) in sorted(peaks.items()):
+            print('    {} {} {}'.format(pid, low, high))
+
+
+def require_gunicorn():
+    if importlib.util.find_spec('gunicorn') is None:
+        raise SystemExit('gunicorn is not installed: pip install -r requirements.txt, '
+                         'or use --server werkzeug or --url')
+
+
+def wait_for(url, server=None, timeout=60):
+    """Wait until ``url`` answers, failing early if the ``server`` process exits."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError('Server process exited with code {}'.format(server.returncode))
+        try:
+            urllib.request.urlopen(url + '/', timeout=5).close()
+            return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    raise RuntimeError('Server at {} did not start'.format(url))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    seed_parser = commands.add_parser('seed', help='Seed the load-test database')
+    seed_parser.add_argument('--days', type=int, default=45)
+    seed_parser.add_argument('--locations', type=int, default=5)
+    seed_parser.add_argument('--users', type=int, default=20)
+    seed_parser.add_argument('--reset', action='store_true')
+
+    serve_parser = commands.add_parser('serve', help='Serve the load-test app')
+    serve_parser.add_argument('--port', type=int, default=5050)
+    serve_parser.add_argument('--workers', type=int, default=4)
+    serve_parser.add_argument('--server', choices=('gunicorn', 'werkzeug'), default='gunicorn')
+
+    run_parser = commands.add_parser('run', help='Run the load test')
+    run_parser.add_argument('--url', help='Test an already running deployment')
+    run_parser.add_argument('--server-pid', type=int,
+                            help='Sample memory of this process tree when --url is used')
+    run_parser.add_argument('--port', type=int, default=5050)
+    run_parser.add_argument('--workers', type=int, default=4)
+    run_parser.add_argument('--server', choices=('gunicorn', 'werkzeug'), default='gunicorn',
+                            help='Local server when --url is not given')
+    run_parser.add_argument('--users', type=int, default=20)
+    run_parser.add_argument('--duration', type=float, default=60)
+    run_parser.add_argument('--days', type=int, default=45,
+                            help='Days of seeded data to draw date ranges from')
+    run_parser.add_argument('--locations', type=int, default=5)
+    run_parser.add_argument('--dashboard-ratio', type=float, default=0.2)
+    run_parser.add_argument('--output', help='Write the full results as JSON')
+
+    args = parser.parse_args()
+    if args.command == 'seed':
+        seed(args.days, args.locations, args.users, args.reset)
+        return
+    if args.command == 'serve':
+        if args.server == 'gunicorn':
+            require_gunicorn()
+        serve(args.port, args.workers, args.server)
+        return
+
+    server = None
+    url, server_pid = args.url, args.server_pid
+    if url is None:
+        if args.server == 'gunicorn':
+            require_gunicorn()
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), 'serve',
+                                   '--port', str(args.port),
+                                   '--workers', str(args.workers),
+                                   '--server', args.server])
+        url, server_pid = 'http://127.0.0.1:{}'.format(args.port), server.pid
+    try:
+        wait_for(url, server)
+        test = LoadTest(url.rstrip('/'), args.users, args.duration, args.days,
+                        args.locations, args.dashboard_ratio)
+        summary = test.run(server_pid)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print_summary(summary)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,11 @@
 #!/usr/bin/env python
+import json
 import os
+import subprocess
+import sys
 from perc import create_app, db
-from perc.models import Location, Reading
+from perc.models import Location, Reading, ScheduledReport, location_registry
+from perc.scheduler import PERIODS, run_scheduler
 from flask_script import Manager, Shell
 from flask_migrate import Migrate, MigrateCommand
 
@@ -11,11 +15,110 @@ migrate = Migrate(app, db)
 
 
 def make_shell_context():
-    return dict(app=app, db=db, Location=Location, Reading=Reading)
+    return dict(app=app, db=db, Location=Location, Reading=Reading,
+                ScheduledReport=ScheduledReport)
 
 
 manager.add_command("shell", Shell(make_context=make_shell_context))
 manager.add_command('db', MigrateCommand)
 
+
+@manager.command
+def test():
+    """Run the unit tests."""
+    import unittest
+    tests = unittest.TestLoader().discover('tests')
+    unittest.TextTestRunner(verbosity=2).run(tests)
+
+
+# Times the heavy imports one after another in a fresh interpreter, for
+# Pythons without -X importtime.  Each figure excludes what was imported before.
+IMPORT_STEPS = '''
+import importlib, json, sys, time
+timings = []
+for name in ('pytz', 'numpy', 'pandas', 'sqlalchemy', 'flask', 'perc', 'process'):
+    started = time.perf_counter()
+    importlib.import_module(name)
+    timings.append((name, time.perf_counter() - started))
+started = time.perf_counter()
+importlib.import_module('perc').create_app(sys.argv[1])
+timings.append(('create_app()', time.perf_counter() - started))
+print(json.dumps(timings))
+'''
+
+
+@manager.option('-t', '--top', dest='top', type=int, default=20)
+@manager.option('-b', '--basic', dest='basic', action='store_true',
+                help='Only time the heavy imports step by step')
+def importtime(top=20, basic=False):
+    """Report the slowest imports when loading the app in a fresh interpreter.
+
+    Uses python -X importtime on Python 3.7 and later, and otherwise (or with
+    --basic) times the heavy imports step by step."""
+    config_name = os.getenv('FLASK_CONFIG') or 'default'
+    if basic or sys.version_info < (3, 7):
+        result = subprocess.run([sys.executable, '-c', IMPORT_STEPS, config_name],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        if result.returncode:
+            raise SystemExit('create_app failed:\n' + result.stderr)
+        print('{:>12}  {}'.format('seconds', 'step'))
+        for step, seconds in json.loads(result.stdout):
+            print('{:>12.3f}  {}'.format(seconds, step))
+        return
+
+    code = 'from perc import create_app; create_app({!r})'.format(config_name)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode:
+        errors = [line for line in result.stderr.splitlines()
+                  if not line.startswith('import time:')]
+        raise SystemExit('create_app failed:\n' + '\n'.join(errors))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    print('{:>12} {:>10}  {}'.format('cumulative', 'self', 'module'))
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:top]:
+        print('{:>10}us {:>8}us  {}'.format(cumulative_us, self_us, module))
+
+
+@manager.option('--once', dest='once', action='store_true',
+                help='Run the due reports now instead of waiting for off-peak hours')
+def scheduler(once=False):
+    """Run the scheduled reports off-peak and mail the results."""
+    run_scheduler(app, once=once)
+
+
+@manager.option('-n', '--name', dest='name', required=True)
+@manager.option('-l', '--locations', dest='locations', required=True,
+                help='Comma separated location names')
+@manager.option('-r', '--recipients', dest='recipients', required=True,
+                help='Comma separated e-mail addresses')
+@manager.option('-p', '--period', dest='period', default='week', choices=PERIODS)
+@manager.option('--temperature', dest='temperature', type=float, default=73.0)
+@manager.option('--temp-tol', dest='temp_tol', type=float, default=6.0)
+@manager.option('--humidity', dest='humidity', type=float, default=50.0)
+@manager.option('--humid-tol', dest='humid_tol', type=float, default=20.0)
+def schedule_report(name, locations, recipients, period, temperature,
+                    temp_tol, humidity, humid_tol):
+    """Add a recurring report definition for the scheduler."""
+    if ScheduledReport.query.filter_by(name=name).first() is not None:
+        raise SystemExit('A scheduled report named {} already exists'.format(name))
+    known = [location_name for location_name, _ in location_registry(refresh=True)]
+    unknown = [loc.strip() for loc in locations.split(',')
+               if loc.strip() and loc.strip() not in known]
+    if unknown:
+        raise SystemExit('Unknown location(s): {}'.format(', '.join(unknown)))
+    db.session.add(ScheduledReport(name=name, location_names=locations,
+                                   recipients=recipients, period=period,
+                                   temperature=temperature, temp_tol=temp_tol,
+                                   humidity=humidity, humid_tol=humid_tol,
+                                   active=True))
+    db.session.commit()
+
+
 if __name__ == '__main__':
     manager.run()
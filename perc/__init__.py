@@ -1,3 +1,4 @@
+import importlib
 from flask import Flask, render_template
 from flask_bootstrap import Bootstrap
 from flask_mail import Mail
@@ -28,4 +29,34 @@ def create_app(config_name):
     from perc.main import main as main_blueprint
     app.register_blueprint(main_blueprint)
 
+    if app.config.get('PERC_WARM_START'):
+        warm_start(app)
+
     return app
+
+
+def warm_start(app):
+    """Pay the cold-start costs before the worker takes traffic.
+
+    Imports the report engine (pandas, pytz) and loads the location registry.
+    The engine is disposed afterwards so that no pooled connection is inherited
+    by forked workers; gunicorn.conf.py opens those per worker with warm_pool."""
+    from perc.models import location_registry
+
+    importlib.import_module('process')
+
+    with app.app_context():
+        location_registry(refresh=True)
+        db.session.remove()
+        db.engine.dispose()
+
+
+def warm_pool(app):
+    """Open PERC_WARM_START_CONNECTIONS pooled database connections.
+
+    Call this in each worker after it has been forked."""
+    with app.app_context():
+        connections = [db.engine.connect()
+                       for _ in range(app.config['PERC_WARM_START_CONNECTIONS'])]
+        for connection in connections:
+            connection.close()
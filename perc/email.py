@@ -0,0 +1,18 @@
+from flask import current_app, render_template
+from flask_mail import Message
+from perc import mail
+
+
+def send_email(to, subject, template, attachments=(), **kwargs):
+    """Send a mail rendered from ``template``.txt and ``template``.html.
+
+    ``attachments`` is an iterable of (filename, content_type, data) tuples."""
+    app = current_app._get_current_object()
+    msg = Message(app.config['FLASKY_MAIL_SUBJECT_PREFIX'] + ' ' + subject,
+                  sender=app.config['FLASKY_MAIL_SENDER'], recipients=to)
+    msg.body = render_template(template + '.txt', **kwargs)
+    msg.html = render_template(template + '.html', **kwargs)
+    for filename, content_type, data in attachments:
+        msg.attach(filename, content_type, data)
+    mail.send(msg)
+    return msg
@@ -1,8 +1,7 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, SubmitField, PasswordField, BooleanField, SelectField, DateField, DecimalField
 from wtforms.validators import DataRequired
-from perc import db
-from perc.models import Location
+from perc.models import location_registry
 
 
 class LoginForm(FlaskForm):
@@ -31,7 +30,6 @@ class ReportForm(FlaskForm):
     submit = SubmitField()
 
     def pop_loc(self):
-        locations = db.session.query(Location).all()
-        loc_choices = [loc.location_name for loc in locations]
+        loc_choices = [name for name, _ in location_registry()]
         loc_names = list(enumerate(loc_choices))
         self.location.choices = loc_names
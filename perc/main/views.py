@@ -1,10 +1,10 @@
 from datetime import datetime
-from flask import render_template, redirect, url_for, request, flash
-from flask_login import login_required, login_user, logout_user
+from flask import render_template, redirect, url_for, request, flash, jsonify, current_app
+from flask_login import login_required, login_user, logout_user, login_url
+from perc import lm
 from perc.main import main
 from perc.main.forms import LoginForm, ReportForm
-from perc.models import User
-from process import Report
+from perc.models import User, location_registry
 
 
 @main.errorhandler(404)
@@ -27,7 +27,7 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(login_name=form.username.data).first()
-        if user is None or form.password.data != 'LogWare':
+        if user is None or not user.verify_password(form.password.data):
             flash('Not Authorized.')
             return redirect(url_for('main.login', **request.args))
         login_user(user, form.remember_me.data)
@@ -54,13 +54,18 @@ def report():
     form = ReportForm()
     form.pop_loc()
     if request.method == 'POST' and form.validate():
-        s = Report(request.form['location'],
-                   request.form['temperature'],
-                   request.form['humidity'],
-                   request.form['temp_tol'],
-                   request.form['humid_tol'],
-                   request.form['start_date'],
-                   request.form['end_date'])
+        from process import NoReadingsError, Report
+        try:
+            s = Report(request.form['location'],
+                       request.form['temperature'],
+                       request.form['humidity'],
+                       request.form['temp_tol'],
+                       request.form['humid_tol'],
+                       request.form['start_date'],
+                       request.form['end_date'])
+        except NoReadingsError as e:
+            flash(str(e))
+            return render_template('report.html', form=form)
 
         return render_template('summary_report.html',
                                loc_name=s.get_location_name(),
@@ -70,7 +75,123 @@ def report():
                                temp_tol=s.temperature_tolerance,
                                humidity=s.humidity,
                                humid_tol=s.humidity_tolerance,
-                               report_data=s.generate_summary(),
+                               summary=s.generate_summary(),
                                current_time=datetime.utcnow())
 
     return render_template('report.html', form=form)
+
+
+@lm.request_loader
+def load_user_from_request(request):
+    """Authenticate /api/ requests with HTTP Basic credentials."""
+    auth = request.authorization
+    if not request.path.startswith('/api/') or auth is None:
+        return None
+    user = User.query.filter_by(login_name=auth.username).first()
+    if user is None or not user.verify_password(auth.password):
+        return None
+    return user
+
+
+@lm.unauthorized_handler
+def unauthorized():
+    if request.path.startswith('/api/'):
+        return jsonify(error='Authentication required'), 401
+    flash(lm.login_message, category=lm.login_message_category)
+    return redirect(login_url(lm.login_view, request.url))
+
+
+REPORT_SPEC_DEFAULTS = dict(temperature=73.0, temp_tol=6.0,
+                            humidity=50.0, humid_tol=20.0)
+
+
+def parse_report_spec(spec, registry):
+    """Check an API report spec and return the Report arguments for it.
+
+    The location is given either by ``location`` (its name) or by
+    ``location_guid``; ``registry`` is the location_registry() list.  Raise
+    ValueError when the spec is incomplete or invalid."""
+    spec = dict(REPORT_SPEC_DEFAULTS, **spec)
+    missing = [key for key in ('start_date', 'end_date')
+               if key not in spec or spec[key] in (None, '')]
+    if spec.get('location') in (None, '') and spec.get('location_guid') in (None, ''):
+        missing.insert(0, 'location or location_guid')
+    if missing:
+        raise ValueError('Missing {}'.format(', '.join(missing)))
+
+    if spec.get('location_guid') not in (None, ''):
+        key, column = 'location_guid', 1
+    else:
+        key, column = 'location', 0
+    matches = [index for index, entry in enumerate(registry) if entry[column] == spec[key]]
+    if not matches:
+        raise ValueError('Unknown {} {}'.format(key, spec[key]))
+
+    try:
+        start = datetime.strptime(spec['start_date'], '%Y-%m-%d')
+        end = datetime.strptime(spec['end_date'], '%Y-%m-%d')
+    except TypeError:
+        raise ValueError('Dates must be strings like 2017-03-26')
+    if end < start:
+        raise ValueError('end_date is before start_date')
+
+    return (matches[0],
+            float(spec['temperature']),
+            float(spec['humidity']),
+            float(spec['temp_tol']),
+            float(spec['humid_tol']),
+            spec['start_date'],
+            spec['end_date'])
+
+
+def parse_report_specs(specs, registry, max_batch):
+    """Check a batch of API report specs and return the Report arguments for each.
+
+    Raise ValueError naming the first invalid spec."""
+    if not isinstance(specs, list) or not specs or \
+            not all(isinstance(spec, dict) for spec in specs):
+        raise ValueError('Expected a report spec or a list of report specs')
+    if len(specs) > max_batch:
+        raise ValueError('At most {} report specs per request'.format(max_batch))
+    reports = []
+    for index, spec in enumerate(specs):
+        try:
+            reports.append(parse_report_spec(spec, registry))
+        except (ValueError, TypeError) as e:
+            raise ValueError('Spec {}: {}'.format(index, e))
+    return reports
+
+
+@main.route('/api/report', methods=['GET', 'POST'])
+@login_required
+def api_report():
+    """Return report summaries as JSON.
+
+    GET takes a single spec as query parameters.  POST takes a JSON spec, a list
+    of specs or {"reports": [...]}, at most PERC_API_MAX_BATCH of them.  Every
+    spec is checked before any report is computed; each entry of ``reports`` is
+    then either a summary or {"error": ...} for that spec."""
+    if request.method == 'POST':
+        specs = request.get_json(silent=True)
+        if isinstance(specs, dict):
+            specs = specs.get('reports', [specs])
+    else:
+        specs = [request.args.to_dict()]
+    try:
+        reports = parse_report_specs(specs, location_registry(),
+                                     current_app.config['PERC_API_MAX_BATCH'])
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    from process import NoReadingsError, Report
+    results = []
+    for spec, args in zip(specs, reports):
+        try:
+            results.append(Report(*args).generate_summary()._asdict())
+        except NoReadingsError as e:
+            results.append(dict(error=str(e)))
+        except Exception:
+            current_app.logger.exception('Report %s failed', spec)
+            results.append(dict(error='Report failed'))
+
+    return jsonify(reports=results)
@@ -1,3 +1,5 @@
+import time
+from flask import current_app
 from perc import db, lm
 from flask_login import UserMixin
 
@@ -71,6 +73,24 @@ class Location(db.Model):
     notes = db.Column(db.Text)
 
 
+_location_registry = {'loaded_at': None, 'locations': []}
+
+
+def location_registry(refresh=False):
+    """Return the [(location_name, location_guid), ...] list, ordered by name.
+
+    The list is cached per process for PERC_LOCATION_CACHE_SECONDS; report forms
+    and Report refer to locations by their index in it."""
+    max_age = current_app.config['PERC_LOCATION_CACHE_SECONDS']
+    loaded_at = _location_registry['loaded_at']
+    if refresh or loaded_at is None or time.time() - loaded_at > max_age:
+        locations = Location.query.order_by(Location.location_name).all()
+        _location_registry['locations'] = [(loc.location_name, loc.location_guid)
+                                           for loc in locations]
+        _location_registry['loaded_at'] = time.time()
+    return _location_registry['locations']
+
+
 class LogSession(db.Model):
     __tablename__ = 'log_sessions'
 
@@ -105,6 +125,32 @@ class Reading(db.Model):
     compromised = db.Column(db.Boolean)
 
 
+class ScheduledReport(db.Model):
+    __tablename__ = 'perc_scheduled_reports'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), nullable=False, unique=True)
+    location_names = db.Column(db.Text, nullable=False)
+    period = db.Column(db.String(8), nullable=False, default='week')
+    temperature = db.Column(db.Float(53), nullable=False, default=73.0)
+    temp_tol = db.Column(db.Float(53), nullable=False, default=6.0)
+    humidity = db.Column(db.Float(53), nullable=False, default=50.0)
+    humid_tol = db.Column(db.Float(53), nullable=False, default=20.0)
+    recipients = db.Column(db.Text, nullable=False)
+    active = db.Column(db.Boolean, default=True)
+    last_period_end = db.Column(db.Date)
+
+    @property
+    def locations(self):
+        """Return the list of location names covered by this report."""
+        return [name.strip() for name in self.location_names.split(',') if name.strip()]
+
+    @property
+    def recipient_list(self):
+        """Return the list of e-mail addresses the results are sent to."""
+        return [addr.strip() for addr in self.recipients.split(',') if addr.strip()]
+
+
 class SensorParameter(db.Model):
     __tablename__ = 'sensor_parameters'
 
@@ -128,6 +174,10 @@ class User(UserMixin, db.Model):
         """Return an identifier."""
         return self.user_guid
 
+    def verify_password(self, password):
+        """Check a password entered for this user."""
+        return password == 'LogWare'
+
     user_guid = db.Column(db.String(32), primary_key=True)
     login_name = db.Column(db.String(32), nullable=False, unique=True)
     first_name = db.Column(db.String(64))
@@ -0,0 +1,139 @@
+import os
+import time
+import datetime
+from flask import current_app, render_template
+from werkzeug.utils import secure_filename
+from perc import db
+from perc.email import send_email
+from perc.models import ScheduledReport, location_registry
+
+PERIODS = ('day', 'week', 'month')
+
+
+def period_bounds(period, today=None):
+    """Return the (start, end) dates of the last complete ``period`` before ``today``.
+
+    Weeks run Monday to Sunday and months are calendar months."""
+    today = today or datetime.date.today()
+    if period == 'day':
+        end = today - datetime.timedelta(days=1)
+        start = end
+    elif period == 'week':
+        end = today - datetime.timedelta(days=today.weekday() + 1)
+        start = end - datetime.timedelta(days=6)
+    elif period == 'month':
+        end = today.replace(day=1) - datetime.timedelta(days=1)
+        start = end.replace(day=1)
+    else:
+        raise ValueError('Unknown report period: {}'.format(period))
+    return start, end
+
+
+def next_run_time(hour, now=None):
+    """Return the next datetime at ``hour`` o'clock after ``now``."""
+    now = now or datetime.datetime.now()
+    run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if run <= now:
+        run += datetime.timedelta(days=1)
+    return run
+
+
+def is_due(scheduled, today=None):
+    """Return True if the last complete period of ``scheduled`` has not been run."""
+    start, end = period_bounds(scheduled.period, today)
+    return scheduled.last_period_end is None or scheduled.last_period_end < end
+
+
+def due_reports(today=None):
+    """Return the active scheduled reports whose last period has not been run."""
+    return [scheduled for scheduled in ScheduledReport.query.filter_by(active=True).all()
+            if is_due(scheduled, today)]
+
+
+def run_report(scheduled, today=None):
+    """Compute, save and mail one scheduled report for its last complete period.
+
+    A location that fails is listed in the mail instead of its summary, so the
+    other locations are still delivered.  Return the path of the saved HTML file."""
+    from process import Report
+    start, end = period_bounds(scheduled.period, today)
+    start_date = start.strftime('%Y-%m-%d')
+    end_date = end.strftime('%Y-%m-%d')
+
+    names = [name for name, _ in location_registry(refresh=True)]
+    summaries = []
+    failures = []
+    for location_name in scheduled.locations:
+        if location_name not in names:
+            failures.append((location_name, 'Location no longer exists'))
+            continue
+        try:
+            s = Report(names.index(location_name),
+                       scheduled.temperature,
+                       scheduled.humidity,
+                       scheduled.temp_tol,
+                       scheduled.humid_tol,
+                       start_date,
+                       end_date)
+            summaries.append(s.generate_summary())
+        except ValueError as e:
+            failures.append((location_name, str(e)))
+        except Exception:
+            current_app.logger.exception('Scheduled report %s failed for %s',
+                                         scheduled.name, location_name)
+            failures.append((location_name, 'Report failed, see the scheduler log'))
+
+    context = dict(scheduled=scheduled,
+                   start_date=start_date,
+                   end_date=end_date,
+                   summaries=summaries,
+                   failures=failures,
+                   current_time=datetime.datetime.utcnow())
+
+    report_dir = current_app.config['PERC_REPORT_DIR']
+    if not os.path.exists(report_dir):
+        os.makedirs(report_dir)
+    filename = secure_filename('{}_{}_{}_{}.html'.format(
+        scheduled.id, scheduled.name, start_date, end_date))
+    path = os.path.join(report_dir, filename)
+    html = render_template('mail/scheduled_report.html', **context)
+    with open(path, 'w') as f:
+        f.write(html)
+
+    send_email(scheduled.recipient_list,
+               '{} {} to {}'.format(scheduled.name, start_date, end_date),
+               'mail/scheduled_report',
+               attachments=[(filename, 'text/html', html)],
+               **context)
+
+    scheduled.last_period_end = end
+    db.session.commit()
+    return path
+
+
+def run_due_reports(today=None):
+    """Run every scheduled report that is due and return the saved file paths."""
+    paths = []
+    for scheduled in due_reports(today):
+        try:
+            paths.append(run_report(scheduled, today))
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Scheduled report %s failed', scheduled.name)
+    return paths
+
+
+def run_scheduler(app, once=False):
+    """Run due reports every day at the configured off-peak hour.
+
+    With ``once`` the due reports are run immediately and the function returns."""
+    while True:
+        if not once:
+            run_at = next_run_time(app.config['PERC_SCHEDULER_HOUR'])
+            time.sleep((run_at - datetime.datetime.now()).total_seconds())
+        with app.app_context():
+            for path in run_due_reports():
+                app.logger.info('Scheduled report saved to %s', path)
+            db.session.remove()
+        if once:
+            break
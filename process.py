@@ -1,8 +1,38 @@
 from perc import db
-from perc.models import Location, Reading
+from perc.models import Reading, location_registry
 import pandas as pd
 import pytz
 import datetime
+from typing import NamedTuple, Optional
+
+
+class Summary(NamedTuple):
+    """Results of a Report, one field per summary column.
+
+    hrs_down_for_maint and dupe_records are not computed yet and stay None."""
+    location: str
+    specification: str
+    start_date: str
+    end_date: str
+    first_point_recorded: str
+    last_point_recorded: str
+    total_hours_evaluated: float
+    total_hours_recorded: float
+    total_hours_out: float
+    percent_out: float
+    hours_temp_high: float
+    hours_temp_low: float
+    hours_rh_high: float
+    hours_rh_low: float
+    hours_overlap: float
+    hours_no_data: float
+    int_greater_than_15: int
+    hrs_down_for_maint: Optional[float] = None
+    dupe_records: Optional[int] = None
+
+
+class NoReadingsError(ValueError):
+    """Raised when a location has no readings in the report period."""
 
 
 class Report:
@@ -17,6 +47,9 @@ class Report:
         self.start_date = start_date
         self.end_date = end_date
         self.df = self.get_details()
+        if self.df.empty:
+            raise NoReadingsError('No readings for {} between {} and {}'.format(
+                self.get_location_name(), self.start_date, self.end_date))
         self.temp_data = self.temp_details()
         self.humidity_data = self.humidity_details()
         self.combined_data = self.combined_details()
@@ -30,13 +63,11 @@ class Report:
         return temp_fahr
 
     def get_location_name(self):
-        names = [loc.location_name for loc in Location.query.all()]
-        location_name = names[int(self.location)]
+        location_name, _ = location_registry()[int(self.location)]
         return location_name
 
     def get_details(self):
-        guids = [loc.location_guid for loc in Location.query.all()]
-        location_guid = guids[int(self.location)]
+        _, location_guid = location_registry()[int(self.location)]
 
         local = pytz.timezone("America/Anchorage")
 
@@ -185,22 +216,27 @@ class Report:
         return readings.duration.sum(axis=0) / 60
 
     def total_hours_out(self):
-        t_hi = self.temp_hours_high()
-        t_lo = self.temp_hours_low()
-        r_hi = self.humidity_hours_high()
-        r_lo = self.humidity_hours_low()
-        overlap = self.get_hours_overlap()
-        total = (t_hi + t_lo) + (r_hi + r_lo) - overlap + self.hours_no_data()
-        return total
+        return self.sum_hours_out(self.temp_hours_high(), self.temp_hours_low(),
+                                  self.humidity_hours_high(), self.humidity_hours_low(),
+                                  self.get_hours_overlap(), self.hours_no_data())
+
+    @staticmethod
+    def sum_hours_out(t_hi, t_lo, r_hi, r_lo, overlap, no_data):
+        """Combine the excursion hours into the total hours out of specification."""
+        return (t_hi + t_lo) + (r_hi + r_lo) - overlap + no_data
 
     def hours_no_data(self):
-        gap_time = pd.to_timedelta(self.get_large_gaps().duration.sum(axis=0), unit='m')
-        first_point = pd.to_datetime(self.get_first_point())
+        return self.gap_hours(self.get_first_point(), self.get_last_point(),
+                              self.get_large_gaps())
+
+    def gap_hours(self, first_point, last_point, large_gaps):
+        """Return the hours without data before first_point, after last_point
+        and in the large gaps between readings."""
+        gap_time = pd.to_timedelta(large_gaps.duration.sum(axis=0), unit='m')
         start = pd.to_datetime(self.start_date)
-        start_gap = first_point - start
+        start_gap = pd.to_datetime(first_point) - start
         end = pd.to_datetime(self.end_date) + pd.Timedelta(hours=24)
-        last_point = pd.to_datetime(self.get_last_point())
-        end_gap = end - last_point
+        end_gap = end - pd.to_datetime(last_point)
 
         return (start_gap + end_gap + gap_time) / pd.Timedelta('1 hour')
 
@@ -208,57 +244,33 @@ class Report:
         return self.combined_data[self.combined_data.duration > 15]
 
     def generate_summary(self):
-        summary = pd.DataFrame(index=None,
-                               columns=['LOCATION', 'SPECIFICATION',
-                                        'START_DATE', 'END_DATE',
-                                        'FIRST_POINT_RECORDED',
-                                        'LAST_POINT_RECORDED',
-                                        'TOTAL_HOURS_EVALUATED',
-                                        'TOTAL_HOURS_RECORDED',
-                                        'TOTAL_HOURS_OUT',
-                                        'PERCENT_OUT', 'HOURS_TEMP_HIGH',
-                                        'HOURS_TEMP_LOW', 'HOURS_RH_HIGH',
-                                        'HOURS_RH_LOW', 'HOURS_OVERLAP',
-                                        'HOURS_NO_DATA', 'INT_GREATER_THAN_15',
-                                        'HRS_DOWN_FOR_MAINT', 'DUPE_RECORDS'])
-
-        summary.LOCATION = [self.get_location_name()]
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'SPECIFICATION'] = self.get_specification()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'START_DATE'] = self.start_date
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'END_DATE'] = self.end_date
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'FIRST_POINT_RECORDED'] = self.get_first_point()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'LAST_POINT_RECORDED'] = self.get_last_point()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'TOTAL_HOURS_EVALUATED'] = self.get_total_hours_evaluated()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'TOTAL_HOURS_RECORDED'] = self.get_total_hours_evaluated() - self.hours_no_data()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'TOTAL_HOURS_OUT'] = self.total_hours_out()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'PERCENT_OUT'] = (self.total_hours_out() / self.get_total_hours_evaluated()) * 100
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'HOURS_TEMP_HIGH'] = self.temp_hours_high()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'HOURS_TEMP_LOW'] = self.temp_hours_low()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'HOURS_RH_HIGH'] = self.humidity_hours_high()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'HOURS_RH_LOW'] = self.humidity_hours_low()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'HOURS_OVERLAP'] = self.get_hours_overlap()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'HOURS_NO_DATA'] = self.hours_no_data()
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'INT_GREATER_THAN_15'] = len(
-            self.get_large_gaps())
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'HRS_DOWN_FOR_MAINT'] = 'TBA'
-        summary.loc[
-            summary.LOCATION == self.get_location_name(), 'DUPE_RECORDS'] = 'TBA'
-
-        return summary.to_html()
+        """Return the report results as a Summary."""
+        first_point = self.get_first_point()
+        last_point = self.get_last_point()
+        large_gaps = self.get_large_gaps()
+        t_hi = self.temp_hours_high()
+        t_lo = self.temp_hours_low()
+        r_hi = self.humidity_hours_high()
+        r_lo = self.humidity_hours_low()
+        overlap = self.get_hours_overlap()
+        no_data = self.gap_hours(first_point, last_point, large_gaps)
+        total_hours_evaluated = self.get_total_hours_evaluated()
+        total_hours_out = self.sum_hours_out(t_hi, t_lo, r_hi, r_lo, overlap, no_data)
+
+        return Summary(location=self.get_location_name(),
+                       specification=self.get_specification(),
+                       start_date=self.start_date,
+                       end_date=self.end_date,
+                       first_point_recorded=first_point,
+                       last_point_recorded=last_point,
+                       total_hours_evaluated=float(total_hours_evaluated),
+                       total_hours_recorded=float(total_hours_evaluated - no_data),
+                       total_hours_out=float(total_hours_out),
+                       percent_out=float(total_hours_out / total_hours_evaluated * 100),
+                       hours_temp_high=float(t_hi),
+                       hours_temp_low=float(t_lo),
+                       hours_rh_high=float(r_hi),
+                       hours_rh_low=float(r_lo),
+                       hours_overlap=float(overlap),
+                       hours_no_data=float(no_data),
+                       int_greater_than_15=len(large_gaps))
@@ -0,0 +1,73 @@
+import unittest
+from perc.main.views import parse_report_spec, parse_report_specs
+
+REGISTRY = [('204', 'guid-204'), ('Cold Room', 'guid-cold'), ('Main Lab', 'guid-main')]
+
+
+def spec(**kwargs):
+    return dict(dict(location='Main Lab', start_date='2017-03-01',
+                     end_date='2017-03-31'), **kwargs)
+
+
+class ParseReportSpecTestCase(unittest.TestCase):
+    def test_by_name(self):
+        args = parse_report_spec(spec(), REGISTRY)
+        self.assertEqual(args, (2, 73.0, 50.0, 6.0, 20.0, '2017-03-01', '2017-03-31'))
+
+    def test_numeric_name(self):
+        self.assertEqual(parse_report_spec(spec(location='204'), REGISTRY)[0], 0)
+
+    def test_by_guid(self):
+        args = parse_report_spec(spec(location=None, location_guid='guid-cold'), REGISTRY)
+        self.assertEqual(args[0], 1)
+
+    def test_index_is_not_a_location(self):
+        with self.assertRaises(ValueError):
+            parse_report_spec(spec(location=1), REGISTRY)
+        with self.assertRaises(ValueError):
+            parse_report_spec(spec(location='1'), REGISTRY)
+
+    def test_unknown_location(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown location'):
+            parse_report_spec(spec(location='Attic'), REGISTRY)
+
+    def test_missing_fields(self):
+        with self.assertRaisesRegex(ValueError, 'location or location_guid, end_date'):
+            parse_report_spec(dict(start_date='2017-03-01'), REGISTRY)
+
+    def test_tolerances_from_strings(self):
+        args = parse_report_spec(spec(temperature='68', temp_tol='2.5'), REGISTRY)
+        self.assertEqual(args[1:5], (68.0, 50.0, 2.5, 20.0))
+
+    def test_single_day(self):
+        parse_report_spec(spec(end_date='2017-03-01'), REGISTRY)
+
+    def test_reversed_dates(self):
+        with self.assertRaisesRegex(ValueError, 'before start_date'):
+            parse_report_spec(spec(start_date='2017-03-31', end_date='2017-03-01'), REGISTRY)
+
+    def test_bad_date(self):
+        with self.assertRaises(ValueError):
+            parse_report_spec(spec(start_date='03/01/2017'), REGISTRY)
+        with self.assertRaises(ValueError):
+            parse_report_spec(spec(start_date=20170301), REGISTRY)
+
+
+class ParseReportSpecsTestCase(unittest.TestCase):
+    def test_batch(self):
+        reports = parse_report_specs([spec(), spec(location='Cold Room')], REGISTRY, 10)
+        self.assertEqual([args[0] for args in reports], [2, 1])
+
+    def test_batch_limit(self):
+        with self.assertRaisesRegex(ValueError, 'At most 2'):
+            parse_report_specs([spec()] * 3, REGISTRY, 2)
+        self.assertEqual(len(parse_report_specs([spec()] * 2, REGISTRY, 2)), 2)
+
+    def test_names_invalid_spec(self):
+        with self.assertRaisesRegex(ValueError, '^Spec 1: '):
+            parse_report_specs([spec(), spec(location='Attic')], REGISTRY, 10)
+
+    def test_not_a_list_of_specs(self):
+        for specs in (None, [], ['Main Lab'], 'Main Lab'):
+            with self.assertRaises(ValueError):
+                parse_report_specs(specs, REGISTRY, 10)
@@ -0,0 +1,55 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+from perc.scheduler import is_due, next_run_time, period_bounds
+
+
+class PeriodBoundsTestCase(unittest.TestCase):
+    def test_day(self):
+        self.assertEqual(period_bounds('day', datetime.date(2017, 3, 1)),
+                         (datetime.date(2017, 2, 28), datetime.date(2017, 2, 28)))
+
+    def test_week_from_monday(self):
+        # 2017-03-27 is a Monday; the last complete week is the one before it.
+        self.assertEqual(period_bounds('week', datetime.date(2017, 3, 27)),
+                         (datetime.date(2017, 3, 20), datetime.date(2017, 3, 26)))
+
+    def test_week_from_sunday(self):
+        self.assertEqual(period_bounds('week', datetime.date(2017, 3, 26)),
+                         (datetime.date(2017, 3, 13), datetime.date(2017, 3, 19)))
+
+    def test_month_from_first_of_month(self):
+        self.assertEqual(period_bounds('month', datetime.date(2017, 3, 1)),
+                         (datetime.date(2017, 2, 1), datetime.date(2017, 2, 28)))
+
+    def test_month_across_year(self):
+        self.assertEqual(period_bounds('month', datetime.date(2017, 1, 15)),
+                         (datetime.date(2016, 12, 1), datetime.date(2016, 12, 31)))
+
+    def test_unknown_period(self):
+        with self.assertRaises(ValueError):
+            period_bounds('year', datetime.date(2017, 1, 15))
+
+
+class NextRunTimeTestCase(unittest.TestCase):
+    def test_later_today(self):
+        now = datetime.datetime(2017, 3, 26, 1, 30)
+        self.assertEqual(next_run_time(2, now), datetime.datetime(2017, 3, 26, 2))
+
+    def test_tomorrow(self):
+        now = datetime.datetime(2017, 3, 26, 2, 0)
+        self.assertEqual(next_run_time(2, now), datetime.datetime(2017, 3, 27, 2))
+
+
+class IsDueTestCase(unittest.TestCase):
+    def test_never_run(self):
+        scheduled = SimpleNamespace(period='week', last_period_end=None)
+        self.assertTrue(is_due(scheduled, datetime.date(2017, 3, 27)))
+
+    def test_already_run(self):
+        scheduled = SimpleNamespace(period='week', last_period_end=datetime.date(2017, 3, 26))
+        self.assertFalse(is_due(scheduled, datetime.date(2017, 3, 29)))
+
+    def test_next_period(self):
+        scheduled = SimpleNamespace(period='month', last_period_end=datetime.date(2017, 2, 28))
+        self.assertTrue(is_due(scheduled, datetime.date(2017, 4, 1)))